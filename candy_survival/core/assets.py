@@ -1,5 +1,6 @@
 ﻿from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 import re
 from typing import Dict, List, Optional
@@ -49,6 +50,7 @@ def get_candy_sprite_path(item: str) -> Optional[str]:
     return CANDY_SPRITE_PATHS.get(item)
 
 
+@lru_cache(maxsize=None)
 def get_candy_display_name(identifier: str) -> str:
     if not identifier:
         return ""
@@ -1,10 +1,21 @@
 import pygame, json
 
+MOVE_UP = 1
+MOVE_DOWN = 2
+MOVE_LEFT = 4
+MOVE_RIGHT = 8
+_MOVE_ACTIONS = (("move_up", MOVE_UP), ("move_down", MOVE_DOWN), ("move_left", MOVE_LEFT), ("move_right", MOVE_RIGHT))
+
 class InputManager:
     def __init__(self, settings_path):
         with open(settings_path,"r",encoding="utf-8") as f:
             self.settings = json.load(f)
         self.keymap = self._build_keymap(self.settings.get("keybinds", {}))
+        self._move_keys = [
+            (self.keymap[action], bit)
+            for action, bit in _MOVE_ACTIONS
+            if self.keymap.get(action, pygame.K_UNKNOWN) != pygame.K_UNKNOWN
+        ]
 
     def _build_keymap(self, keybinds):
         mapping={}
@@ -20,3 +31,10 @@ class InputManager:
         if key is None or key == pygame.K_UNKNOWN:
             return False
         return keys[key]
+
+    def movement_mask(self, keys):
+        mask = 0
+        for key, bit in self._move_keys:
+            if keys[key]:
+                mask |= bit
+        return mask
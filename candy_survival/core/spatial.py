@@ -0,0 +1,43 @@
+from typing import Any, Dict, List, Tuple
+
+import pygame
+
+
+class SpatialHash:
+    def __init__(self, cell_size: int):
+        self.cell_size = max(1, int(cell_size))
+        self.cells: Dict[Tuple[int, int], List[Any]] = {}
+
+    def _cell_span(self, rect: pygame.Rect) -> Tuple[range, range]:
+        size = self.cell_size
+        xs = range(rect.left // size, (rect.right - 1) // size + 1)
+        ys = range(rect.top // size, (rect.bottom - 1) // size + 1)
+        return xs, ys
+
+    def insert_rect(self, rect: pygame.Rect, value: Any) -> None:
+        xs, ys = self._cell_span(rect)
+        cells = self.cells
+        for cy in ys:
+            for cx in xs:
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [value]
+                else:
+                    bucket.append(value)
+
+    def query_rect(self, rect: pygame.Rect) -> List[Any]:
+        xs, ys = self._cell_span(rect)
+        cells = self.cells
+        seen = set()
+        found: List[Any] = []
+        for cy in ys:
+            for cx in xs:
+                bucket = cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for value in bucket:
+                    key = id(value)
+                    if key not in seen:
+                        seen.add(key)
+                        found.append(value)
+        return found
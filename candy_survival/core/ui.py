@@ -92,25 +92,44 @@ class InventoryUI:
         self.pos = pos
         self.slot_size = slot_size
         self.pad = pad
+        self._icons: Dict[str, Optional[pygame.Surface]] = {}
+        self._count_texts: Dict[int, pygame.Surface] = {}
+
+    def _icon(self, item: str) -> Optional[pygame.Surface]:
+        if item in self._icons:
+            return self._icons[item]
+        try:
+            icon_path = get_candy_sprite_path(item) or f"assets/sprites/{item}.bmp"
+            icon = load_sprite(icon_path)
+        except Exception:
+            icon = None
+        self._icons[item] = icon
+        return icon
+
+    def _count_text(self, count: int) -> pygame.Surface:
+        text = self._count_texts.get(count)
+        if text is None:
+            text = self.ui_assets.font.render(str(count), True, (255, 255, 255))
+            self._count_texts[count] = text
+        return text
 
     def draw(self, surface: pygame.Surface) -> None:
         x0, y0 = self.pos
+        step = self.slot_size + self.pad
+        slot = self.ui_assets.slot
+        slots = self.inventory.slots
         index = 0
         for row in range(self.inventory.rows):
+            y = y0 + row * step
             for col in range(self.inventory.cols):
-                x = x0 + col * (self.slot_size + self.pad)
-                y = y0 + row * (self.slot_size + self.pad)
-                surface.blit(self.ui_assets.slot, (x, y))
-                stack = self.inventory.slots[index]
+                x = x0 + col * step
+                surface.blit(slot, (x, y))
+                stack = slots[index]
                 if stack:
-                    try:
-                        icon_path = get_candy_sprite_path(stack.item) or f"assets/sprites/{stack.item}.bmp"
-                        icon = load_sprite(icon_path)
+                    icon = self._icon(stack.item)
+                    if icon is not None:
                         surface.blit(icon, (x, y))
-                    except Exception:
-                        pass
-                    count_text = self.ui_assets.font.render(str(stack.count), True, (255, 255, 255))
-                    surface.blit(count_text, (x + 2, y + 2))
+                    surface.blit(self._count_text(stack.count), (x + 2, y + 2))
                 index += 1
 
 
@@ -129,6 +148,21 @@ class CraftingUI:
         self.visible = False
         self._craft_callback = craft_callback
         self._requirement_formatter = requirement_formatter
+        self._overlay: Optional[pygame.Surface] = None
+        self._title: Optional[pygame.Surface] = None
+        self._line_prefixes = [
+            f"[{index + 1}] {result} <= {self._need_text(recipe)}"
+            for index, (result, recipe) in enumerate(recipes.items())
+        ]
+        self._line_cache: Dict[int, Tuple[str, pygame.Surface]] = {}
+
+    @staticmethod
+    def _need_text(recipe: Dict[str, int]) -> str:
+        parts = []
+        for item, amount in recipe.items():
+            label = get_candy_display_name(item) if item.startswith("candy_") else item
+            parts.append(f"{label} x{amount}")
+        return ", ".join(parts)
 
     def toggle(self) -> None:
         self.visible = not self.visible
@@ -141,26 +175,27 @@ class CraftingUI:
         top_left_x = self.center[0] - width // 2
         top_left_y = self.center[1] - height // 2
 
-        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
-        overlay.fill((20, 20, 20, 220))
-        surface.blit(overlay, (top_left_x, top_left_y))
+        if self._overlay is None:
+            self._overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+            self._overlay.fill((20, 20, 20, 220))
+        surface.blit(self._overlay, (top_left_x, top_left_y))
 
-        title = self.ui_assets.font.render("CRAFTING", True, (255, 255, 0))
-        surface.blit(title, (top_left_x + 20, top_left_y + 20))
+        if self._title is None:
+            self._title = self.ui_assets.font.render("CRAFTING", True, (255, 255, 0))
+        surface.blit(self._title, (top_left_x + 20, top_left_y + 20))
 
         cursor_y = top_left_y + 60
+        line_cache = self._line_cache
         for index, (result, recipe) in enumerate(self.recipes.items()):
-            parts = []
-            for item, amount in recipe.items():
-                label = get_candy_display_name(item) if item.startswith("candy_") else item
-                parts.append(f"{label} x{amount}")
-            need_text = ", ".join(parts)
             status = ""
             if self._requirement_formatter:
                 status = f" ({self._requirement_formatter(result, recipe)})"
-            line = f"[{index + 1}] {result} <= {need_text}{status}"
-            text_surface = self.ui_assets.font.render(line, True, (230, 230, 230))
-            surface.blit(text_surface, (top_left_x + 20, cursor_y))
+            line = self._line_prefixes[index] + status
+            cached = line_cache.get(index)
+            if cached is None or cached[0] != line:
+                cached = (line, self.ui_assets.font.render(line, True, (230, 230, 230)))
+                line_cache[index] = cached
+            surface.blit(cached[1], (top_left_x + 20, cursor_y))
             cursor_y += 28
 
     def craft_index(self, index: int) -> bool:
@@ -3,15 +3,19 @@ import random
 import re
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import pygame
 
+from core.input import MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT, MOVE_UP
 from core.inventory import Inventory
 from core.assets import get_candy_sprite_path, get_factory_frame_paths, get_candy_display_name
 
 
+@lru_cache(maxsize=None)
 def load_sprite(path: str) -> pygame.Surface:
+    """Return the cached Surface for path; it is shared, so .copy() it before fill, set_alpha or blitting onto it."""
     image = pygame.image.load(path)
     return image.convert_alpha() if image.get_alpha() is not None else image.convert()
 
@@ -21,6 +25,25 @@ _FRAME_INDEX_PATTERN = re.compile(r"(\d+)$")
 _ALLOWED_ANIMATION_EXTS = {".png", ".bmp", ".gif"}
 
 
+def _movement_vector(mask: int) -> Tuple[float, float]:
+    raw_dx = raw_dy = 0.0
+    if mask & MOVE_UP:
+        raw_dy -= 1.0
+    if mask & MOVE_DOWN:
+        raw_dy += 1.0
+    if mask & MOVE_LEFT:
+        raw_dx -= 1.0
+    if mask & MOVE_RIGHT:
+        raw_dx += 1.0
+    magnitude = math.hypot(raw_dx, raw_dy)
+    if magnitude > 0:
+        return raw_dx / magnitude, raw_dy / magnitude
+    return 0.0, 0.0
+
+
+_MOVEMENT_VECTORS = tuple(_movement_vector(mask) for mask in range(16))
+
+
 def _animation_frame_sort_key(path: Path) -> tuple[int, str]:
     match = _FRAME_INDEX_PATTERN.search(path.stem)
     index = int(match.group(1)) if match else 0
@@ -28,9 +51,14 @@ def _animation_frame_sort_key(path: Path) -> tuple[int, str]:
 
 
 def load_animation_frames(folder: Path) -> List[pygame.Surface]:
+    return list(_load_animation_frames_cached(str(folder)))
+
+
+@lru_cache(maxsize=None)
+def _load_animation_frames_cached(folder: str) -> Tuple[pygame.Surface, ...]:
     folder_path = Path(folder)
     if not folder_path.exists():
-        return []
+        return ()
     frames: List[pygame.Surface] = []
     for candidate in sorted(
         (
@@ -46,7 +74,7 @@ def load_animation_frames(folder: Path) -> List[pygame.Surface]:
             frames.append(load_sprite(str(candidate)))
         except pygame.error:
             continue
-    return frames
+    return tuple(frames)
 
 
 class AnimatedSpriteController:
@@ -124,6 +152,8 @@ CANDY_TYPES = [
 
 @dataclass
 class ChatBubble:
+    __slots__ = ("text", "color", "until")
+
     text: str
     color: Tuple[int, int, int]
     until: int
@@ -161,7 +191,7 @@ class Player:
         self.image = initial_image
         self.rect = self.image.get_rect(center=(int(x), int(y)))
 
-    def _move_single_axis(self, delta: float, axis: str, colliders: Iterable[pygame.Rect]) -> None:
+    def _move_single_axis(self, delta: float, axis: str, colliders: Sequence[pygame.Rect]) -> None:
         if delta == 0:
             return
 
@@ -172,6 +202,8 @@ class Player:
             self.y += delta
             self.rect.centery = int(self.y)
 
+        if self.rect.collidelist(colliders) == -1:
+            return
         for collider in colliders:
             if self.rect.colliderect(collider):
                 if axis == "x":
@@ -187,23 +219,8 @@ class Player:
                         self.rect.top = collider.bottom
                     self.y = float(self.rect.centery)
 
-    def update(self, dt: float, inputmgr, keys, colliders: Iterable[pygame.Rect] = ()) -> None:
-        raw_dx = raw_dy = 0.0
-        if inputmgr.is_pressed("move_up", keys):
-            raw_dy -= 1.0
-        if inputmgr.is_pressed("move_down", keys):
-            raw_dy += 1.0
-        if inputmgr.is_pressed("move_left", keys):
-            raw_dx -= 1.0
-        if inputmgr.is_pressed("move_right", keys):
-            raw_dx += 1.0
-
-        magnitude = math.hypot(raw_dx, raw_dy)
-        if magnitude > 0:
-            norm_dx = raw_dx / magnitude
-            norm_dy = raw_dy / magnitude
-        else:
-            norm_dx = norm_dy = 0.0
+    def update(self, dt: float, movement: int, colliders: Sequence[pygame.Rect] = ()) -> None:
+        norm_dx, norm_dy = _MOVEMENT_VECTORS[movement]
 
         move_dx = norm_dx * self.speed * dt
         move_dy = norm_dy * self.speed * dt
@@ -216,7 +233,7 @@ class Player:
             self.y += move_dy
             self.rect.center = (int(self.x), int(self.y))
 
-        self._update_animation(dt, norm_dx, norm_dy, magnitude > 0)
+        self._update_animation(dt, norm_dx, norm_dy, norm_dx != 0.0 or norm_dy != 0.0)
 
 
     def _update_animation(self, dt: float, dir_x: float, dir_y: float, moving: bool) -> None:
@@ -238,6 +255,16 @@ class Player:
 
 
 class ItemEntity:
+    __slots__ = (
+        "item",
+        "yield_count",
+        "image",
+        "rect",
+        "alive",
+        "spawn_position",
+        "candy_index",
+    )
+
     def __init__(self, item_name: str, x: float, y: float, yield_count: int = 1):
         self.item = item_name
         self.yield_count = yield_count
@@ -253,9 +280,12 @@ class ItemEntity:
         self.rect = self.image.get_rect(center=(int(x), int(y)))
         self.alive = True
         self.spawn_position: Optional[Tuple[int, int]] = None
+        self.candy_index = -1
 
 
 class StaticEntity:
+    __slots__ = ("image", "rect")
+
     def __init__(self, surface: pygame.Surface, x: float, y: float):
         self.image = surface
         self.rect = self.image.get_rect(center=(int(x), int(y)))
@@ -323,9 +353,11 @@ class Machine(StaticEntity):
             return
 
         self._frame_index = (self._frame_index + 1) % len(self.animation_frames)
-        center = self.rect.center
+        rect = self.rect
+        center = rect.center
         self.image = self.animation_frames[self._frame_index]
-        self.rect = self.image.get_rect(center=center)
+        rect.size = self.image.get_size()
+        rect.center = center
         self._next_frame_at = now + self.animation_interval_ms
 
     def next_upgrade_cost(self) -> Optional[int]:
@@ -416,6 +448,8 @@ class WallSegment(StaticEntity):
 
 
 class CandyGiver(StaticEntity):
+    __slots__ = ("cooldown_until", "used_today", "chat")
+
     def __init__(self, x: float, y: float):
         surface = pygame.Surface((32, 48))
         surface.fill((50, 30, 90))
@@ -439,6 +473,8 @@ class TrashCan(StaticEntity):
 
 
 class NPC(StaticEntity):
+    __slots__ = ("_target_fps", "animator", "x", "y", "speed", "target", "next_wander_ms", "chat")
+
     def __init__(self, x: float, y: float, speed: float, target_fps: float = 60.0):
         self._target_fps = max(1.0, float(target_fps))
         front_frames = load_animation_frames(Path("assets/sprites/NPC/Boy/Front"))
@@ -465,7 +501,7 @@ class NPC(StaticEntity):
         self.next_wander_ms = 0
         self.chat: Optional[ChatBubble] = None
 
-    def _move_single_axis(self, delta: float, axis: str, colliders: Iterable[pygame.Rect]) -> None:
+    def _move_single_axis(self, delta: float, axis: str, colliders: Sequence[pygame.Rect]) -> None:
         if delta == 0:
             return
         if axis == "x":
@@ -474,6 +510,8 @@ class NPC(StaticEntity):
         else:
             self.y += delta
             self.rect.centery = int(self.y)
+        if self.rect.collidelist(colliders) == -1:
+            return
         for collider in colliders:
             if self.rect.colliderect(collider):
                 if axis == "x":
@@ -493,7 +531,7 @@ class NPC(StaticEntity):
         self,
         dt: float,
         now: int,
-        colliders: Iterable[pygame.Rect],
+        colliders: Sequence[pygame.Rect],
         bounds: Tuple[float, float, float, float],
     ) -> None:
         if self.target is None or now >= self.next_wander_ms:
@@ -509,12 +547,13 @@ class NPC(StaticEntity):
         tx, ty = self.target
         dx = tx - self.x
         dy = ty - self.y
-        distance = math.hypot(dx, dy)
-        if distance <= 3:
+        distance_sq = dx * dx + dy * dy
+        if distance_sq <= 9:
             self.target = None
             self._update_animation(dt, dir_x, dir_y, False)
             return
 
+        distance = math.sqrt(distance_sq)
         dir_x = dx / distance
         dir_y = dy / distance
         moving = True
@@ -576,7 +615,7 @@ class DayChaser(StaticEntity):
         self.y = float(self.rect.centery)
         self.speed = speed
 
-    def _move_single_axis(self, delta: float, axis: str, colliders: Iterable[pygame.Rect]) -> None:
+    def _move_single_axis(self, delta: float, axis: str, colliders: Sequence[pygame.Rect]) -> None:
         if delta == 0:
             return
         if axis == 'x':
@@ -585,6 +624,8 @@ class DayChaser(StaticEntity):
         else:
             self.y += delta
             self.rect.centery = int(self.y)
+        if self.rect.collidelist(colliders) == -1:
+            return
         for collider in colliders:
             if self.rect.colliderect(collider):
                 if axis == 'x':
@@ -604,7 +645,7 @@ class DayChaser(StaticEntity):
         self,
         dt: float,
         target: Tuple[float, float],
-        colliders: Iterable[pygame.Rect],
+        colliders: Sequence[pygame.Rect],
         bounds: Tuple[float, float, float, float],
         safe_bounds: Tuple[float, float, float, float],
     ) -> None:
@@ -661,6 +702,19 @@ class DayChaser(StaticEntity):
 
 
 class Ghost:
+    __slots__ = (
+        "_target_fps",
+        "animator",
+        "image",
+        "rect",
+        "x",
+        "y",
+        "base_speed",
+        "speed",
+        "random_target",
+        "next_random_ms",
+    )
+
     def __init__(self, x: float, y: float, speed: float, target_fps: float = 60.0):
         self._target_fps = max(1.0, float(target_fps))
         ghost_frames = load_animation_frames(Path("assets/sprites/NPC/Ghost"))
@@ -714,7 +768,9 @@ class Ghost:
         else:
             if self.random_target:
                 rx, ry = self.random_target
-                if math.hypot(rx - self.x, ry - self.y) <= 4:
+                dx = rx - self.x
+                dy = ry - self.y
+                if dx * dx + dy * dy <= 16:
                     self.random_target = None
 
             min_interval, max_interval = random_interval
@@ -148,19 +148,21 @@ class EventManager:
         self.long_hint_enabled = enabled
         self._schedule_hint()
 
-    def seconds_until_event(self) -> Optional[int]:
+    def seconds_until_event(self, now: Optional[int] = None) -> Optional[int]:
         if not self.next_event_time:
             return None
-        now = pygame.time.get_ticks()
+        if now is None:
+            now = pygame.time.get_ticks()
         if self.next_event_time <= now:
             return 0
         return (self.next_event_time - now) // 1000
 
-    def update(self, player_inventory):
+    def update(self, player_inventory, now: Optional[int] = None):
         if not (self.night_active and self.next_event_time and self.current_event):
             return None
 
-        now = pygame.time.get_ticks()
+        if now is None:
+            now = pygame.time.get_ticks()
         if self.hint_time and now >= self.hint_time:
             text = f"Radio: Incoming event {self.current_event.label}!"
             self._emit_radio_message(text, (0, 255, 255))
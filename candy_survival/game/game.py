@@ -1,7 +1,10 @@
 import json
+from typing import Dict, Optional
 
 import pygame
 
+from core.ui import UIAssets
+
 from game.states.menu import MenuState
 from game.states.pause import PauseState
 from game.states.playing import PlayingState
@@ -28,6 +31,9 @@ class Game:
         self.running = True
         self.target_fps = self.settings.get("fps", 60)
 
+        self._fonts: Dict[int, pygame.font.Font] = {}
+        self._ui_assets: Optional[UIAssets] = None
+
         self.states = []
         self._state_factories = {
             "menu": lambda: MenuState(self),
@@ -39,6 +45,18 @@ class Game:
         self.current_state = None
         self.change_state("menu")
 
+    def get_font(self, size: int) -> pygame.font.Font:
+        font = self._fonts.get(size)
+        if font is None:
+            font = pygame.font.SysFont(None, size)
+            self._fonts[size] = font
+        return font
+
+    def get_ui_assets(self) -> UIAssets:
+        if self._ui_assets is None:
+            self._ui_assets = UIAssets("assets/sprites/ui_slot.bmp", self.get_font(24))
+        return self._ui_assets
+
     def _make_state(self, name: str):
         if name not in self._state_factories:
             raise KeyError(f"Unknown state '{name}'")
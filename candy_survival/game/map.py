@@ -1,6 +1,6 @@
 import json
 import random
-from typing import Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 class TileMap:
@@ -43,6 +43,7 @@ class TileMap:
 
     def random_positions(self, count: int, avoid_safe_zone: bool = True) -> List[Tuple[int, int]]:
         positions: List[Tuple[int, int]] = []
+        seen = set()
         attempted = 0
         max_attempts = max(2000, count * 10)
         while len(positions) < count and attempted < max_attempts:
@@ -52,7 +53,8 @@ class TileMap:
             if avoid_safe_zone and self._inside_safe_zone(tile_x, tile_y):
                 continue
             world = self.tile_to_world_center(tile_x, tile_y)
-            if world not in positions:
+            if world not in seen:
+                seen.add(world)
                 positions.append(world)
         return positions
 
@@ -80,3 +82,47 @@ class TileMap:
     def safe_rect_tiles(self) -> Optional[Tuple[int, int, int, int]]:
         return self.safe_rect
 
+
+class PositionPool:
+    def __init__(self, positions: Iterable[Tuple[int, int]] = ()):
+        self._positions: List[Tuple[int, int]] = []
+        self._index: Dict[Tuple[int, int], int] = {}
+        self.reset(positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, position: Tuple[int, int]) -> bool:
+        return position in self._index
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(self._positions)
+
+    def reset(self, positions: Iterable[Tuple[int, int]]) -> None:
+        self._positions.clear()
+        self._index.clear()
+        for position in positions:
+            self.add(position)
+
+    def add(self, position: Tuple[int, int]) -> None:
+        if position in self._index:
+            return
+        self._index[position] = len(self._positions)
+        self._positions.append(position)
+
+    def remove(self, position: Tuple[int, int]) -> bool:
+        index = self._index.pop(position, None)
+        if index is None:
+            return False
+        last = self._positions.pop()
+        if index < len(self._positions):
+            self._positions[index] = last
+            self._index[last] = index
+        return True
+
+    def random_pop(self) -> Optional[Tuple[int, int]]:
+        if not self._positions:
+            return None
+        position = self._positions[random.randrange(len(self._positions))]
+        self.remove(position)
+        return position
@@ -7,9 +7,9 @@ from game.states.playing import RECIPES
 class InstructionState:
     def __init__(self, game):
         self.game=game
-        self.title_font=pygame.font.SysFont(None, 56)
-        self.section_font=pygame.font.SysFont(None, 32)
-        self.body_font=pygame.font.SysFont(None, 24)
+        self.title_font=game.get_font(56)
+        self.section_font=game.get_font(32)
+        self.body_font=game.get_font(24)
         self.controls=[
             "Move: WASD or Arrow keys",
             "Interact: E",
@@ -2,8 +2,8 @@ import pygame
 class MenuState:
     def __init__(self, game):
         self.game=game
-        self.font=pygame.font.SysFont(None,48)
-        self.small=pygame.font.SysFont(None,28)
+        self.font=game.get_font(48)
+        self.small=game.get_font(28)
         self.options=[("New game", self.start), ("Intructions", self.instructions), ("Quit", self.quit)]
         self.selected=0
     def start(self): self.game.change_state("playing")
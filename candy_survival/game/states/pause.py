@@ -1,7 +1,7 @@
 import pygame
 class PauseState:
     def __init__(self, game):
-        self.game=game; self.font=pygame.font.SysFont(None,42)
+        self.game=game; self.font=game.get_font(42)
         self.options=[("Continue", self.resume), ("Intructions", self.intructions), ("Back to menu", self.to_menu), ("Quit", self.quit)]; self.selected=0
     def resume(self): self.game.pop_state()
     def intructions(self):
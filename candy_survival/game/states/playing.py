@@ -1,15 +1,18 @@
-﻿import json
+﻿import heapq
+import itertools
+import json
 import math
 import random
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import pygame
 
 from core.input import InputManager
 from core.resources import CandyStockpile, WorldProgression
+from core.spatial import SpatialHash
 from core.assets import get_candy_display_name
-from core.ui import CraftingUI, InfoUI, InventoryUI, MessageLog, TrashUI, UIAssets
+from core.ui import CraftingUI, InfoUI, InventoryUI, MessageLog, TrashUI
 from game.audio import Audio
 from game.entities import (
     CANDY_TYPES,
@@ -32,7 +35,7 @@ from game.events import (
     derive_counter_items,
     parse_event_definitions,
 )
-from game.map import TileMap
+from game.map import PositionPool, TileMap
 
 
 RECIPES = {
@@ -63,30 +66,42 @@ RADIO_CHATTER_LINES = (
     "Tip of the day: keep your treats dry.",
 )
 
-CANDY_LABELS = {
-    "candy_red": get_candy_display_name("candy_red"),
-    "candy_blue": get_candy_display_name("candy_blue"),
-    "candy_green": get_candy_display_name("candy_green"),
-    "candy_yellow": get_candy_display_name("candy_yellow"),
-    "candy_purple": get_candy_display_name("candy_purple"),
-}
+CANDY_LABELS = {candy: get_candy_display_name(candy) for candy in CANDY_TYPES}
+CANDY_INDEX = {candy: index for index, candy in enumerate(CANDY_TYPES)}
 
 DAY_START_HOUR = 6
 DAY_END_HOUR = 20
 
+MAP_CHUNK_PX = 1024
+CHAT_BUBBLE_CACHE_SIZE = 64
+
+
+def _blit_batch(surface: pygame.Surface, sequence: List[Tuple[pygame.Surface, object]]) -> None:
+    fblits = getattr(surface, "fblits", None)
+    if fblits is not None:
+        fblits(sequence)
+    else:
+        surface.blits(sequence, False)
+
+
+def _is_opaque(surface: pygame.Surface) -> bool:
+    width, height = surface.get_size()
+    return pygame.mask.from_surface(surface, 254).count() == width * height
+
 
 class PlayingState:
     def __init__(self, game):
         self.game = game
         self.screen = game.screen
+        self._screen_size: Tuple[int, int] = self.screen.get_size()
 
         with open("settings.json", "r", encoding="utf-8") as handle:
             self.settings: Dict[str, float] = json.load(handle)
 
         self.clock = pygame.time.Clock()
         self.tile_size = self.settings["tile_size"]
-        self.font = pygame.font.SysFont(None, 24)
-        self.ui_assets = UIAssets("assets/sprites/ui_slot.bmp", self.font)
+        self.font = game.get_font(24)
+        self.ui_assets = game.get_ui_assets()
         self.msglog = MessageLog(self.font)
         self.inputmgr = InputManager("settings.json")
 
@@ -143,6 +158,17 @@ class PlayingState:
         )
         self.safe_half_width = self.safe_rect_world.width / 2.0
         self.safe_half_height = self.safe_rect_world.height / 2.0
+        self._safe_bounds_tuple: Tuple[float, float, float, float] = (
+            self.safe_rect_world.left,
+            self.safe_rect_world.top,
+            self.safe_rect_world.right,
+            self.safe_rect_world.bottom,
+        )
+        self._tile_size_sq = self.tile_size * self.tile_size
+        self._safe_patrol_limit = (
+            self.safe_center_world[0] - self.tile_size,
+            self.safe_center_world[1] - self.tile_size,
+        )
         half_tile = self.tile_size // 2
         self.world_min_x = half_tile
         self.world_max_x = self.tilemap.world_width - half_tile
@@ -152,8 +178,8 @@ class PlayingState:
         hunter_tile = (max(2, self.safe_center_tiles[0] - 8), max(2, self.safe_center_tiles[1] - 8))
         self.day_hunter_spawn_world = self.tilemap.tile_to_world_center(*hunter_tile)
         self.day_hunter_home = self.day_hunter_spawn_world
-        trigger_width = max(self.tile_size, int(self.safe_center_world[0] - self.tile_size))
-        trigger_height = max(self.tile_size, int(self.safe_center_world[1] - self.tile_size))
+        trigger_width = max(self.tile_size, int(self._safe_patrol_limit[0]))
+        trigger_height = max(self.tile_size, int(self._safe_patrol_limit[1]))
         self.day_hunter_trigger_rect = pygame.Rect(0, 0, trigger_width, trigger_height)
         self.day_hunter_speed = float(self.settings.get("day_hunter_speed", self.settings["ghost_speed"]))
         self.day_hunter_engaged = False
@@ -214,19 +240,25 @@ class PlayingState:
         self.machine_victory_level = min(int(self.settings.get("machine_victory_level", 5)), self.machine_max_level)
         self.victory_triggered = False
         self.machine_level_chat_color = (255, 255, 200)
+        self._machine_chat_zone: Optional[pygame.Rect] = None
+        self._machine_level_chat_shown = False
+        self._blocker_grid = SpatialHash(self.tile_size * 2)
         self._build_structures()
 
         self.walls: List[WallSegment] = []
         self.wall_colliders: List[pygame.Rect] = []
+        self._wall_grid = SpatialHash(self.tile_size * 2)
         self._build_walls()
 
         self.items: List[ItemEntity] = []
-        self.candy_active_counts: Dict[str, int] = {candy: 0 for candy in CANDY_TYPES}
-        self.candy_positions_pool = self.tilemap.random_positions(
-            self.tilemap.candy_spawn_count,
-            True,
-        )
-        self.available_candy_positions: List[Tuple[int, int]] = list(self.candy_positions_pool)
+        self._live_item_rects: List[pygame.Rect] = []
+        self.candy_active_counts: List[int] = [0] * len(CANDY_TYPES)
+        self.candy_positions_pool = [
+            position
+            for position in self.tilemap.random_positions(self.tilemap.candy_spawn_count, True)
+            if not self._is_position_blocked(position)
+        ]
+        self.available_candy_positions = PositionPool(self.candy_positions_pool)
         self.candy_respawn_schedule: List[Tuple[int, str]] = []
         self.candy_respawns_enabled = False
         self.candy_respawn_delay_ms = int(
@@ -237,13 +269,12 @@ class PlayingState:
         )
         self.candy_max_per_type = self.settings["candy_max_per_type"]
 
-        self.battery_positions_pool = self.tilemap.random_positions(
-            self.tilemap.battery_spawn_count,
-            True,
-        )
-        self.available_battery_positions: List[Tuple[int, int]] = list(
-            self.battery_positions_pool
-        )
+        self.battery_positions_pool = [
+            position
+            for position in self.tilemap.random_positions(self.tilemap.battery_spawn_count, True)
+            if not self._is_position_blocked(position)
+        ]
+        self.available_battery_positions = PositionPool(self.battery_positions_pool)
         self.battery_respawn_schedule: List[int] = []
         self.battery_respawns_enabled = False
         self.battery_respawn_delay_ms = int(
@@ -262,6 +293,10 @@ class PlayingState:
         self._spawn_givers()
         self.npcs: List[NPC] = []
         self._spawn_npcs()
+        self._chat_entities: List = []
+        self._active_chats: List[Tuple[int, int, object]] = []
+        self._chat_sequence = itertools.count()
+        self._rebuild_chat_entities()
         if not self.is_night:
             self._spawn_day_hunter()
 
@@ -284,15 +319,43 @@ class PlayingState:
         self.border_target_half_width = self.safe_half_width
         self.border_target_half_height = self.safe_half_height
         self.border_half_width, self.border_half_height = self._initial_border_extents()
+        self._border_dirty = True
+        self._cached_border_bounds: Tuple[float, float, float, float] = (0.0, 0.0, 0.0, 0.0)
+        self._cached_border_rect = pygame.Rect(0, 0, 1, 1)
         self._recalculate_border_shrink_speed()
 
         self.minimap_visible = True
         self.minimap_size = (180, 140)
+        self._minimap_bg: Optional[pygame.Surface] = None
+        self._minimap_border_bounds: Optional[Tuple[float, float, float, float]] = None
+        self._minimap_border_rect = pygame.Rect(0, 0, 0, 0)
+        self._candy_panel_bg: Optional[pygame.Surface] = None
+        self._candy_panel_lines: Dict[str, Tuple[int, pygame.Surface]] = {}
+        self._recipe_requirement_cache: Dict[str, Tuple[Tuple[int, ...], str]] = {}
+        self._key_handlers = self._build_key_handlers()
         self.cam_x = 0
         self.cam_y = 0
 
-        self._tile_sprite_cache: Dict[str, pygame.Surface] = {}
-        self.safe_tile_surfaces = self._load_safe_tile_images()
+        self._tile_sprites_by_name: Dict[str, pygame.Surface] = {}
+        sprites_dir = Path("assets/sprites")
+        self._grass_tile_path = sprites_dir / "tile_grass.bmp"
+        self._tile_paths: Dict[str, Path] = {
+            path.stem: path for path in sprites_dir.glob("*.bmp") if path.is_file()
+        }
+        self._tile_paths["grass"] = self._grass_tile_path
+        self._tile_id_grid: Optional[List[List[int]]] = None
+        self._sprites_by_id: List[pygame.Surface] = []
+        self._safe_tile_surfaces: Optional[Dict[str, pygame.Surface]] = None
+        self._map_chunk_tiles = max(1, MAP_CHUNK_PX // self.tile_size)
+        self._map_chunk_px = self._map_chunk_tiles * self.tile_size
+        self._map_chunk_counts = (
+            -(-self.tilemap.width // self._map_chunk_tiles),
+            -(-self.tilemap.height // self._map_chunk_tiles),
+        )
+        self._map_chunks: Dict[Tuple[int, int], pygame.Surface] = {}
+        self._dark_overlay: Optional[pygame.Surface] = None
+        self._dark_overlay_alpha = -1
+        self._bubble_cache: Dict[Tuple[str, Tuple[int, int, int]], pygame.Surface] = {}
 
         self.events = EventManager(
             audio=self.audio,
@@ -313,8 +376,11 @@ class PlayingState:
         self._schedule_radio_chatter(initial=True)
 
         self.interaction_radius_px = self.settings["interaction_radius_tiles"] * self.tile_size
+        self.interaction_radius_px_sq = self.interaction_radius_px ** 2
+        self._reach_sq_cache: Dict[Tuple[int, int, float], float] = {}
         self.crafting_radius_px = self.settings["crafting_close_radius_tiles"] * self.tile_size
         self.cutscene_until = 0
+        self._now_ms = pygame.time.get_ticks()
 
     def _create_player(self) -> Player:
         cx, cy = self.safe_center_world
@@ -331,9 +397,12 @@ class PlayingState:
 
     def _build_structures(self) -> None:
         sx, sy, sw, sh = self.safe_rect_tiles
+        span_x = max(0, sw - 1)
+        span_y = max(0, sh - 1)
+
         def safe_tile(fx: float, fy: float) -> Tuple[int, int]:
-            tile_x = int(round(sx + fx * max(0, sw - 1)))
-            tile_y = int(round(sy + fy * max(0, sh - 1)))
+            tile_x = int(round(sx + fx * span_x))
+            tile_y = int(round(sy + fy * span_y))
             return self.tilemap.tile_to_world_center(tile_x, tile_y)
 
         machine_layout = [
@@ -372,6 +441,11 @@ class PlayingState:
         self.radio = Radio(*radio_pos)
         self.table = CraftingTable(*table_pos)
         self.trash_can = TrashCan(*trash_pos)
+        self._static_draw_entities = tuple(
+            entity for entity in (self.radio, self.table, self.trash_can) if entity
+        )
+        for entity in (*self.machines, *self._static_draw_entities):
+            self._blocker_grid.insert_rect(entity.rect, entity.rect)
 
     def _parse_machine_level_data(self, raw) -> Dict[int, Dict[str, float]]:
         data: Dict[int, Dict[str, float]] = {}
@@ -407,12 +481,14 @@ class PlayingState:
         total = 0
         bonus = 0
         amount = max(0, int(amount))
+        add = self.candy_stockpile.add
+        rand = random.random
+        chance = self._machine_bonus_chance(candy_type)
         for _ in range(amount):
-            self.candy_stockpile.add(candy_type, 1)
+            add(candy_type, 1)
             total += 1
-            chance = self._machine_bonus_chance(candy_type)
-            if chance > 0.0 and random.random() < chance:
-                self.candy_stockpile.add(candy_type, 1)
+            if chance > 0.0 and rand() < chance:
+                add(candy_type, 1)
                 total += 1
                 bonus += 1
         return total, bonus
@@ -540,33 +616,31 @@ class PlayingState:
         for wall in (top, bottom, left, right):
             if wall:
                 self.walls.append(wall)
-                self.wall_colliders.append(wall.rect.copy())
+                collider = wall.rect
+                self.wall_colliders.append(collider)
+                self._wall_grid.insert_rect(collider, collider)
+                self._blocker_grid.insert_rect(collider, collider)
+
+    def _walls_near(self, rect: pygame.Rect) -> List[pygame.Rect]:
+        return self._wall_grid.query_rect(rect)
 
     def _reserve_candy_position(self) -> Optional[Tuple[int, int]]:
-        if not self.available_candy_positions:
-            return None
-        index = random.randrange(len(self.available_candy_positions))
-        return self.available_candy_positions.pop(index)
+        return self.available_candy_positions.random_pop()
 
     def _release_candy_position(self, position: Tuple[int, int]) -> None:
-        self.available_candy_positions.append(position)
+        self.available_candy_positions.add(position)
 
     def _reserve_battery_position(self) -> Optional[Tuple[int, int]]:
-        if not self.available_battery_positions:
-            return None
-        index = random.randrange(len(self.available_battery_positions))
-        return self.available_battery_positions.pop(index)
+        return self.available_battery_positions.random_pop()
 
     def _release_battery_position(self, position: Tuple[int, int]) -> None:
-        self.available_battery_positions.append(position)
+        self.available_battery_positions.add(position)
 
     def _safe_bounds(self, buffer: float = 0.0) -> Tuple[float, float, float, float]:
-        return (
-            self.safe_rect_world.left - buffer,
-            self.safe_rect_world.top - buffer,
-            self.safe_rect_world.right + buffer,
-            self.safe_rect_world.bottom + buffer,
-        )
+        if not buffer:
+            return self._safe_bounds_tuple
+        left, top, right, bottom = self._safe_bounds_tuple
+        return (left - buffer, top - buffer, right + buffer, bottom + buffer)
 
     @staticmethod
     def _point_in_bounds(x: float, y: float, bounds: Tuple[float, float, float, float]) -> bool:
@@ -583,18 +657,15 @@ class PlayingState:
         left, top, right, bottom = bounds
         if x < left or x > right or y < top or y > bottom:
             return x, y, False
-        distances = [
-            (x - left, 'left'),
-            (right - x, 'right'),
-            (y - top, 'top'),
-            (bottom - y, 'bottom'),
-        ]
-        side = min(distances, key=lambda item: item[0])[1]
-        if side == 'left':
+        to_left = x - left
+        to_right = right - x
+        to_top = y - top
+        nearest = min(to_left, to_right, to_top, bottom - y)
+        if to_left == nearest:
             x = left - padding
-        elif side == 'right':
+        elif to_right == nearest:
             x = right + padding
-        elif side == 'top':
+        elif to_top == nearest:
             y = top - padding
         else:
             y = bottom + padding
@@ -627,25 +698,29 @@ class PlayingState:
         if not (within_x and within_y):
             return True
         rect = self._position_rect(position)
-        for wall in self.wall_colliders:
-            if rect.colliderect(wall):
-                return True
-        for machine in self.machines:
-            if rect.colliderect(machine.rect):
-                return True
-        for entity in filter(None, [self.radio, self.table, getattr(self, "trash_can", None)]):
-            if rect.colliderect(entity.rect):
-                return True
-        for giver in getattr(self, "givers", []):
-            if rect.colliderect(giver.rect):
-                return True
+        if rect.collidelist(self._blocker_grid.query_rect(rect)) != -1:
+            return True
         for npc in getattr(self, "npcs", []):
             if rect.colliderect(npc.rect):
                 return True
-        for item in self.items:
-            if item.alive and rect.colliderect(item.rect):
-                return True
-        return False
+        return rect.collidelist(self._live_item_rects) != -1
+
+    def _add_item(self, entity: ItemEntity) -> None:
+        self.items.append(entity)
+        self._live_item_rects.append(entity.rect)
+
+    def _remove_item_at(self, index: int) -> ItemEntity:
+        items = self.items
+        rects = self._live_item_rects
+        item = items[index]
+        last = len(items) - 1
+        if index != last:
+            items[index] = items[last]
+            rects[index] = rects[last]
+        items.pop()
+        rects.pop()
+        item.alive = False
+        return item
 
     def _clamp_entity_to_world(self, entity) -> None:
         entity.x = max(self.world_min_x, min(self.world_max_x, entity.x))
@@ -659,92 +734,113 @@ class PlayingState:
         return 1
 
     def _spawn_candy(self, candy_type: str) -> bool:
-        if self.candy_active_counts[candy_type] >= self.candy_max_per_type:
+        if self.candy_active_counts[CANDY_INDEX[candy_type]] >= self.candy_max_per_type:
             return False
         attempts = max(1, len(self.available_candy_positions))
+        reserve = self._reserve_candy_position
+        release = self._release_candy_position
+        is_blocked = self._is_position_blocked
         for _ in range(attempts):
-            position = self._reserve_candy_position()
+            position = reserve()
             if position is None:
                 return False
-            if self._is_position_blocked(position):
-                self._release_candy_position(position)
+            if is_blocked(position):
+                release(position)
                 continue
-            yield_count = self._candy_yield_for_type(candy_type)
-            entity = ItemEntity(candy_type, *position, yield_count)
-            entity.spawn_position = position
-            self.items.append(entity)
-            self.candy_active_counts[candy_type] += 1
+            self._place_candy(candy_type, position)
             return True
         return False
 
+    def _place_candy(self, candy_type: str, position: Tuple[int, int]) -> None:
+        yield_count = self._candy_yield_for_type(candy_type)
+        entity = ItemEntity(candy_type, *position, yield_count)
+        entity.spawn_position = position
+        candy_index = CANDY_INDEX[candy_type]
+        entity.candy_index = candy_index
+        self._add_item(entity)
+        self.candy_active_counts[candy_index] += 1
+
     def _schedule_candy_respawn(self, candy_type: str) -> None:
         if not self.candy_respawns_enabled:
             return
-        spawn_time = pygame.time.get_ticks() + self.candy_respawn_delay_ms
-        self.candy_respawn_schedule.append((spawn_time, candy_type))
+        spawn_time = self._now_ms + self.candy_respawn_delay_ms
+        heapq.heappush(self.candy_respawn_schedule, (spawn_time, candy_type))
 
     def _spawn_initial_candies(self) -> None:
         initial = min(self.candy_max_per_type, self.settings["initial_candy_spawn_per_type"])
         for candy in CANDY_TYPES:
             for _ in range(initial):
-                if not self._spawn_candy(candy):
-                    break
+                position = self._reserve_candy_position()
+                if position is None:
+                    return
+                self._place_candy(candy, position)
 
     def _spawn_battery(self) -> bool:
         if self.battery_active_count >= self.battery_max_count:
             return False
         attempts = max(1, len(self.available_battery_positions))
+        reserve = self._reserve_battery_position
+        release = self._release_battery_position
+        is_blocked = self._is_position_blocked
         for _ in range(attempts):
-            position = self._reserve_battery_position()
+            position = reserve()
             if position is None:
                 return False
-            if self._is_position_blocked(position):
-                self._release_battery_position(position)
+            if is_blocked(position):
+                release(position)
                 continue
-            entity = ItemEntity("battery", *position, 1)
-            entity.spawn_position = position
-            self.items.append(entity)
-            self.battery_active_count += 1
+            self._place_battery(position)
             return True
         return False
 
+    def _place_battery(self, position: Tuple[int, int]) -> None:
+        entity = ItemEntity("battery", *position, 1)
+        entity.spawn_position = position
+        self._add_item(entity)
+        self.battery_active_count += 1
+
     def _schedule_battery_respawn(self) -> None:
         if not self.battery_respawns_enabled:
             return
-        respawn_time = pygame.time.get_ticks() + self.battery_respawn_delay_ms
-        self.battery_respawn_schedule.append(respawn_time)
+        respawn_time = self._now_ms + self.battery_respawn_delay_ms
+        heapq.heappush(self.battery_respawn_schedule, respawn_time)
 
     def _spawn_initial_batteries(self) -> None:
         initial = min(
             int(self.settings["initial_battery_item_count"]),
             self.battery_max_count,
         )
-        for _ in range(initial):
-            if not self._spawn_battery():
+        occupied = {item.spawn_position for item in self.items}
+        skipped: List[Tuple[int, int]] = []
+        placed = 0
+        while placed < initial:
+            position = self._reserve_battery_position()
+            if position is None:
                 break
+            if position in occupied:
+                skipped.append(position)
+                continue
+            self._place_battery(position)
+            placed += 1
+        for position in skipped:
+            self._release_battery_position(position)
 
     def _refresh_day_resources(self) -> None:
         self.candy_respawn_schedule.clear()
         self.battery_respawn_schedule.clear()
 
-        self.available_candy_positions = list(self.candy_positions_pool)
-        self.available_battery_positions = list(self.battery_positions_pool)
-        self.candy_active_counts = {candy: 0 for candy in CANDY_TYPES}
-        self.battery_active_count = 0
-
-        for item in self.items:
-            if item.item in CANDY_TYPES:
-                self.candy_active_counts[item.item] += 1
-                if item.spawn_position and item.spawn_position in self.available_candy_positions:
-                    self.available_candy_positions.remove(item.spawn_position)
-            elif item.item == "battery":
-                self.battery_active_count += 1
-                if item.spawn_position and item.spawn_position in self.available_battery_positions:
-                    self.available_battery_positions.remove(item.spawn_position)
+        occupied = {item.spawn_position for item in self.items if item.spawn_position}
+        self.available_candy_positions.reset(
+            position for position in self.candy_positions_pool if position not in occupied
+        )
+        self.available_battery_positions.reset(
+            position for position in self.battery_positions_pool if position not in occupied
+        )
 
         initial_candy = min(self.candy_max_per_type, self.settings["initial_candy_spawn_per_type"])
-        for candy in CANDY_TYPES:
-            needed = max(0, initial_candy - self.candy_active_counts[candy])
+        counts = self.candy_active_counts
+        for index, candy in enumerate(CANDY_TYPES):
+            needed = max(0, initial_candy - counts[index])
             for _ in range(needed):
                 if not self._spawn_candy(candy):
                     break
@@ -757,23 +853,22 @@ class PlayingState:
 
     def _spawn_givers(self) -> None:
         count = int(self.settings["giver_count"])
-        attempts = 0
         max_attempts = max(30, count * 6)
-        while len(self.givers) < count and attempts < max_attempts:
-            attempts += 1
-            position = self.tilemap.random_positions(1, True)[0]
+        for position in self.tilemap.random_positions(max_attempts, True):
+            if len(self.givers) >= count:
+                break
             if self._is_position_blocked(position):
                 continue
             giver = CandyGiver(*position)
             self.givers.append(giver)
+            self._blocker_grid.insert_rect(giver.rect, giver.rect)
 
     def _spawn_npcs(self) -> None:
         count = int(self.settings["npc_max_count"])
-        attempts = 0
         max_attempts = max(40, count * 8)
-        while len(self.npcs) < count and attempts < max_attempts:
-            attempts += 1
-            position = self.tilemap.random_positions(1, True)[0]
+        for position in self.tilemap.random_positions(max_attempts, True):
+            if len(self.npcs) >= count:
+                break
             if self._is_position_blocked(position):
                 continue
             if self._is_inside_safe_zone(position):
@@ -799,16 +894,23 @@ class PlayingState:
 
     def _select_hunter_patrol_target(self) -> Tuple[float, float]:
         base_x, base_y = self.day_hunter_home
+        uniform = random.uniform
+        cos = math.cos
+        sin = math.sin
+        angle_min = -math.pi * 0.85
+        angle_max = -math.pi * 0.15
+        radius_max = max(80, self.tile_size * 5)
+        min_x, max_x = self.world_min_x, self.world_max_x
+        min_y, max_y = self.world_min_y, self.world_max_y
+        limit_x, limit_y = self._safe_patrol_limit
         for _ in range(20):
-            angle = random.uniform(-math.pi * 0.85, -math.pi * 0.15)
-            radius = random.uniform(40, max(80, self.tile_size * 5))
-            x = base_x + math.cos(angle) * radius
-            y = base_y + math.sin(angle) * radius
-            x = max(self.world_min_x, min(self.world_max_x, x))
-            y = max(self.world_min_y, min(self.world_max_y, y))
-            if x > self.safe_center_world[0] - self.tile_size:
-                continue
-            if y > self.safe_center_world[1] - self.tile_size:
+            angle = uniform(angle_min, angle_max)
+            radius = uniform(40, radius_max)
+            x = base_x + cos(angle) * radius
+            y = base_y + sin(angle) * radius
+            x = max(min_x, min(max_x, x))
+            y = max(min_y, min(max_y, y))
+            if x > limit_x or y > limit_y:
                 continue
             candidate = (x, y)
             if self._is_inside_safe_zone(candidate):
@@ -841,21 +943,30 @@ class PlayingState:
         self.border_shrink_speed_x = diff_x / duration if duration else 0.0
         self.border_shrink_speed_y = diff_y / duration if duration else 0.0
 
-    def _current_border_bounds(self) -> Tuple[float, float, float, float]:
+    def _refresh_border_cache(self) -> None:
         cx, cy = self.safe_center_world
         half_w = self.border_half_width
         half_h = self.border_half_height
-        return (cx - half_w, cy - half_h, cx + half_w, cy + half_h)
-
-    def _current_border_rect(self) -> pygame.Rect:
-        left, top, right, bottom = self._current_border_bounds()
+        left, top, right, bottom = cx - half_w, cy - half_h, cx + half_w, cy + half_h
+        self._cached_border_bounds = (left, top, right, bottom)
         left_i = int(math.floor(left))
         top_i = int(math.floor(top))
         right_i = int(math.ceil(right))
         bottom_i = int(math.ceil(bottom))
-        width = max(1, right_i - left_i)
-        height = max(1, bottom_i - top_i)
-        return pygame.Rect(left_i, top_i, width, height)
+        self._cached_border_rect = pygame.Rect(
+            left_i, top_i, max(1, right_i - left_i), max(1, bottom_i - top_i)
+        )
+        self._border_dirty = False
+
+    def _current_border_bounds(self) -> Tuple[float, float, float, float]:
+        if self._border_dirty:
+            self._refresh_border_cache()
+        return self._cached_border_bounds
+
+    def _current_border_rect(self) -> pygame.Rect:
+        if self._border_dirty:
+            self._refresh_border_cache()
+        return self._cached_border_rect
 
     def handle_event(self, event: pygame.event.Event) -> None:
         if event.type == pygame.KEYDOWN:
@@ -876,15 +987,9 @@ class PlayingState:
                         else:
                             self.msglog.add("Slot empty.", (160, 160, 160))
                     return
-            if event.key == self.inputmgr.keymap.get(
-                "pause", pygame.K_ESCAPE
-            ) or event.key == pygame.K_ESCAPE:
-                self.trash_ui.hide()
-                self.game.push_state("pause")
-            elif event.key == self.inputmgr.keymap.get("toggle_minimap", pygame.K_m):
-                self.minimap_visible = not self.minimap_visible
-            elif event.key == pygame.K_e:
-                self.try_interact()
+            handler = self._key_handlers.get(event.key)
+            if handler:
+                handler()
             elif self.craft_ui.visible and event.key in (
                 pygame.K_1,
                 pygame.K_2,
@@ -899,95 +1004,154 @@ class PlayingState:
                     self.msglog.add("Craft failed!", (255, 120, 120))
                     self.audio.sfx("fail")
 
+    def _build_key_handlers(self) -> Dict[int, Callable[[], None]]:
+        keymap = self.inputmgr.keymap
+        handlers: Dict[int, Callable[[], None]] = {}
+        handlers[pygame.K_e] = self.try_interact
+        handlers[keymap.get("toggle_minimap", pygame.K_m)] = self._toggle_minimap
+        handlers[keymap.get("pause", pygame.K_ESCAPE)] = self._open_pause
+        handlers[pygame.K_ESCAPE] = self._open_pause
+        return handlers
+
+    def _open_pause(self) -> None:
+        self.trash_ui.hide()
+        self.game.push_state("pause")
+
+    def _toggle_minimap(self) -> None:
+        self.minimap_visible = not self.minimap_visible
+
     def _within_interaction(self, entity, extra_radius: float = 0.0) -> bool:
+        return self._interaction_distance_sq(entity, extra_radius) is not None
+
+    def _interaction_distance_sq(self, entity, extra_radius: float = 0.0) -> Optional[float]:
         if not entity:
-            return False
+            return None
         px, py = self.player.rect.center
-        ex, ey = entity.rect.center
-        reach = self.interaction_radius_px + extra_radius + max(entity.rect.width, entity.rect.height) * 0.5
-        return math.hypot(px - ex, py - ey) <= reach
+        rect = entity.rect
+        ex, ey = rect.center
+        dx = px - ex
+        dy = py - ey
+        dist_sq = dx * dx + dy * dy
+        if dist_sq <= self.interaction_radius_px_sq:
+            return dist_sq
+        if dist_sq <= self._reach_sq(rect.width, rect.height, extra_radius):
+            return dist_sq
+        return None
+
+    def _reach_sq(self, width: int, height: int, extra_radius: float) -> float:
+        key = (width, height, extra_radius)
+        reach_sq = self._reach_sq_cache.get(key)
+        if reach_sq is None:
+            reach = self.interaction_radius_px + extra_radius + max(width, height) * 0.5
+            reach_sq = reach * reach
+            self._reach_sq_cache[key] = reach_sq
+        return reach_sq
 
     def try_interact(self) -> None:
-        now = pygame.time.get_ticks()
-
-        if self.radio and self._within_interaction(self.radio):
-            self.trash_ui.hide()
-            if self.player.inventory.remove("battery", 1):
-                self.radio.batteries += 1
-                self.events.set_long_hint(True)
-                remaining = self.radio.batteries
-                suffix = "s" if remaining != 1 else ""
-                self.msglog.add(
-                    f"Inserted battery into radio. {remaining} early alert{suffix} ready.",
-                    (0, 200, 255),
-                )
-                self.audio.sfx("success")
-                self._radio_chat(
-                    f"Radio charged ({remaining} early alert{suffix}).",
-                    (0, 200, 255),
-                )
-            else:
-                self.msglog.add("No battery available!", (255, 120, 120))
-                self.audio.sfx("fail")
+        target = self._nearest_interactable()
+        if target is None:
             return
+        entity, handler = target
+        handler(entity, pygame.time.get_ticks())
+
+    def _nearest_interactable(self) -> Optional[Tuple[object, Callable[[object, int], None]]]:
+        groups = (
+            ((self.radio,), self._interact_radio),
+            ((self.table,), self._interact_table),
+            ((self.trash_can,), self._interact_trash),
+            (self.machines, self._interact_machine),
+            (self.givers, self._interact_giver),
+            (self.npcs, self._interact_npc),
+        )
+        distance_sq = self._interaction_distance_sq
+        for entities, handler in groups:
+            best = None
+            best_d2 = 0.0
+            for entity in entities:
+                d2 = distance_sq(entity)
+                if d2 is None:
+                    continue
+                if best is None or d2 < best_d2:
+                    best = entity
+                    best_d2 = d2
+            if best is not None:
+                return best, handler
+        return None
+
+    def _interact_radio(self, radio: Radio, now: int) -> None:
+        self.trash_ui.hide()
+        if self.player.inventory.remove("battery", 1):
+            radio.batteries += 1
+            self.events.set_long_hint(True)
+            remaining = radio.batteries
+            suffix = "s" if remaining != 1 else ""
+            self.msglog.add(
+                f"Inserted battery into radio. {remaining} early alert{suffix} ready.",
+                (0, 200, 255),
+            )
+            self.audio.sfx("success")
+            self._radio_chat(
+                f"Radio charged ({remaining} early alert{suffix}).",
+                (0, 200, 255),
+            )
+        else:
+            self.msglog.add("No battery available!", (255, 120, 120))
+            self.audio.sfx("fail")
 
-        if self.table and self._within_interaction(self.table):
-            self.trash_ui.hide()
-            self.craft_ui.toggle()
-            return
-
-        if self.trash_can and self._within_interaction(self.trash_can):
-            self.craft_ui.visible = False
-            self.trash_ui.toggle()
-            return
-
-        for machine in self.machines:
-            if self._within_interaction(machine):
-                self.trash_ui.hide()
-                upgraded = machine.try_upgrade(
-                    self.candy_stockpile,
-                    self.msglog,
-                    self.audio,
-                    self.world_progress,
-                )
-                if upgraded:
-                    self._check_machine_victory()
-                return
-
-        for giver in self.givers:
-            if self._within_interaction(giver):
-                self.trash_ui.hide()
-                if giver.ready(now):
-                    candy_type = random.choice(CANDY_TYPES)
-                    amount = random.randint(
-                        int(self.settings["giver_reward_min"]),
-                        int(self.settings["giver_reward_max"]),
-                    )
-                    gained, bonus = self._collect_candy(candy_type, amount)
-                    giver.cooldown_until = now + int(self.settings["giver_cooldown_sec"] * 1000)
-                    giver.used_today = True
-                    message = random.choice(GIVER_MESSAGES)
-                    display = CANDY_LABELS[candy_type]
-                    log_text = f"Giver: +{gained} {display} candy"
-                    if bonus:
-                        log_text += f" (+{bonus} bonus)"
-                    self.msglog.add(log_text, (180, 220, 255))
-                    self._show_chat(giver, message, (200, 160, 255))
-                    self.audio.sfx("success")
-                else:
-                    self.msglog.add("Giver is resting.", (180, 180, 180))
-                return
+    def _interact_table(self, table: CraftingTable, now: int) -> None:
+        self.trash_ui.hide()
+        self.craft_ui.toggle()
+
+    def _interact_trash(self, trash_can: TrashCan, now: int) -> None:
+        self.craft_ui.visible = False
+        self.trash_ui.toggle()
+
+    def _interact_machine(self, machine: Machine, now: int) -> None:
+        self.trash_ui.hide()
+        upgraded = machine.try_upgrade(
+            self.candy_stockpile,
+            self.msglog,
+            self.audio,
+            self.world_progress,
+        )
+        if upgraded:
+            self._check_machine_victory()
+
+    def _interact_giver(self, giver: CandyGiver, now: int) -> None:
+        self.trash_ui.hide()
+        if giver.ready(now):
+            candy_type = random.choice(CANDY_TYPES)
+            amount = random.randint(
+                int(self.settings["giver_reward_min"]),
+                int(self.settings["giver_reward_max"]),
+            )
+            gained, bonus = self._collect_candy(candy_type, amount)
+            giver.cooldown_until = now + int(self.settings["giver_cooldown_sec"] * 1000)
+            giver.used_today = True
+            message = random.choice(GIVER_MESSAGES)
+            display = CANDY_LABELS[candy_type]
+            log_text = f"Giver: +{gained} {display} candy"
+            if bonus:
+                log_text += f" (+{bonus} bonus)"
+            self.msglog.add(log_text, (180, 220, 255))
+            self._show_chat(giver, message, (200, 160, 255))
+            self.audio.sfx("success")
+        else:
+            self.msglog.add("Giver is resting.", (180, 180, 180))
 
-        for npc in self.npcs:
-            if self._within_interaction(npc):
-                line = random.choice(NPC_DIALOGUES)
-                self._show_chat(npc, line, (255, 255, 255))
-                self.msglog.add(f"NPC: {line}", (200, 200, 255))
-                return
+    def _interact_npc(self, npc: NPC, now: int) -> None:
+        line = random.choice(NPC_DIALOGUES)
+        self._show_chat(npc, line, (255, 255, 255))
+        self.msglog.add(f"NPC: {line}", (200, 200, 255))
 
     def _show_chat(self, entity, text: str, color: Tuple[int, int, int]) -> None:
         duration = int(self.settings["npc_chat_duration_ms"])
-        entity.chat = ChatBubble(text, color, pygame.time.get_ticks() + duration)
+        until = pygame.time.get_ticks() + duration
+        entity.chat = ChatBubble(text, color, until)
+        self._track_chat(entity, until)
+
+    def _track_chat(self, entity, until: int) -> None:
+        heapq.heappush(self._active_chats, (until, next(self._chat_sequence), entity))
 
     def _radio_chat(self, text: str, color: Tuple[int, int, int]) -> None:
         if self.radio:
@@ -1046,12 +1210,15 @@ class PlayingState:
         self._show_chat(self.radio, message, self.radio_chatter_color)
         self._schedule_radio_chatter()
 
-    def _format_recipe_requirement(self, _: str, recipe: Dict[str, int]) -> str:
-        parts = []
-        for item, count in recipe.items():
-            have = self.candy_stockpile.amount(item)
-            parts.append(f"{have}/{count}")
-        return " | ".join(parts)
+    def _format_recipe_requirement(self, result: str, recipe: Dict[str, int]) -> str:
+        amount = self.candy_stockpile.amount
+        haves = tuple(amount(item) for item in recipe)
+        cached = self._recipe_requirement_cache.get(result)
+        if cached is not None and cached[0] == haves:
+            return cached[1]
+        text = " | ".join(f"{have}/{count}" for have, count in zip(haves, recipe.values()))
+        self._recipe_requirement_cache[result] = (haves, text)
+        return text
 
     def _craft_recipe(self, result: str, recipe: Dict[str, int]) -> bool:
         if not self.candy_stockpile.can_afford(recipe):
@@ -1083,28 +1250,30 @@ class PlayingState:
         if self.victory_triggered:
             return
         dt = min(dt, 0.1)
-        keys = pygame.key.get_pressed()
-        self.player.update(dt, self.inputmgr, keys, self.wall_colliders)
+        now = pygame.time.get_ticks()
+        self._now_ms = now
+        movement = self.inputmgr.movement_mask(pygame.key.get_pressed())
+        self.player.update(dt, movement, self.wall_colliders)
         self._clamp_entity_to_world(self.player)
 
         self._advance_time(dt)
         self._update_lighting(dt)
         self._update_border(dt)
-        self._update_candy_respawns()
-        self._update_battery_respawns()
-        self._update_ghosts(dt)
-        self._update_npcs(dt)
+        self._update_candy_respawns(now)
+        self._update_battery_respawns(now)
+        self._update_ghosts(dt, now)
+        self._update_npcs(dt, now)
         self._update_day_hunter(dt)
         self._check_machine_victory()
         if self.victory_triggered:
             return
-        self._update_machine_level_chat()
-        self._update_chat_bubbles()
+        self._update_machine_level_chat(now)
+        self._update_chat_bubbles(now)
         self._handle_pickups()
         self._enforce_ui_ranges()
-        self._update_events()
+        self._update_events(now)
         self._update_camera()
-        self._update_info_panel()
+        self._update_info_panel(now)
 
     def _advance_time(self, dt: float) -> None:
         previous_minutes = self.time_minutes
@@ -1136,32 +1305,36 @@ class PlayingState:
         self.msglog.add(f"Day {self.day} begins!", (200, 255, 200))
         self.ghosts.clear()
         self.border_half_width, self.border_half_height = self._initial_border_extents()
+        self._border_dirty = True
         self._recalculate_border_shrink_speed()
         self._refresh_day_resources()
         for giver in self.givers:
             giver.reset_daily()
         self.npcs = []
         self._spawn_npcs()
+        self._rebuild_chat_entities()
         self._spawn_day_hunter()
         if self.events.long_hint_enabled:
             self.events.set_long_hint(False)
 
     def _on_night_start(self) -> None:
         self.is_night = True
-        self.events.begin_night(pygame.time.get_ticks(), self.event_night_delay_ms)
+        self.events.begin_night(self._now_ms, self.event_night_delay_ms)
         self.msglog.add("Night falls. Stay alert!", (255, 200, 120))
         self.border_half_width, self.border_half_height = self._initial_border_extents()
+        self._border_dirty = True
         self._recalculate_border_shrink_speed()
         self.npcs = []
+        self._rebuild_chat_entities()
         self._despawn_day_hunter()
-        self.next_ghost_spawn_ms = pygame.time.get_ticks() + self.ghost_spawn_interval_ms
+        self.next_ghost_spawn_ms = self._now_ms + self.ghost_spawn_interval_ms
 
     def _update_lighting(self, dt: float) -> None:
-        target = 1.0 if self.is_night else 0.0
-        if self.light_level < target:
-            self.light_level = min(target, self.light_level + dt * self.lighting_transition_rate)
-        elif self.light_level > target:
-            self.light_level = max(target, self.light_level - dt * self.lighting_transition_rate)
+        step = dt * self.lighting_transition_rate
+        if self.is_night:
+            self.light_level = min(1.0, self.light_level + step)
+        else:
+            self.light_level = max(0.0, self.light_level - step)
 
     def _update_border(self, dt: float) -> None:
         if not self.is_night:
@@ -1173,44 +1346,51 @@ class PlayingState:
                 self.border_half_width - self.border_shrink_speed_x * dt,
             )
             progressed = True
+            self._border_dirty = True
         if self.border_half_height > self.border_target_half_height:
             self.border_half_height = max(
                 self.border_target_half_height,
                 self.border_half_height - self.border_shrink_speed_y * dt,
             )
             progressed = True
-        if not progressed:
+            self._border_dirty = True
+        if not progressed and (
+            self.border_half_width != self.border_target_half_width
+            or self.border_half_height != self.border_target_half_height
+        ):
             self.border_half_width = self.border_target_half_width
             self.border_half_height = self.border_target_half_height
+            self._border_dirty = True
 
-    def _update_candy_respawns(self) -> None:
+    def _update_candy_respawns(self, now: int) -> None:
         if not self.candy_respawns_enabled:
             return
-        now = pygame.time.get_ticks()
-        ready = [entry for entry in self.candy_respawn_schedule if entry[0] <= now]
-        if not ready:
+        schedule = self.candy_respawn_schedule
+        if not schedule:
             return
-        self.candy_respawn_schedule = [
-            entry for entry in self.candy_respawn_schedule if entry[0] > now
-        ]
-        for _, candy_type in ready:
+        if schedule[0][0] > now:
+            return
+        ready: List[str] = []
+        while schedule and schedule[0][0] <= now:
+            ready.append(heapq.heappop(schedule)[1])
+        for candy_type in ready:
             spawned = 0
             while spawned < self.candy_respawn_batch and self._spawn_candy(candy_type):
                 spawned += 1
 
-    def _update_battery_respawns(self) -> None:
+    def _update_battery_respawns(self, now: int) -> None:
         if not self.battery_respawns_enabled:
             return
-        if not self.battery_respawn_schedule:
+        schedule = self.battery_respawn_schedule
+        if not schedule:
             return
-        now = pygame.time.get_ticks()
-        ready = [time for time in self.battery_respawn_schedule if time <= now]
-        if not ready:
+        if schedule[0] > now:
             return
-        self.battery_respawn_schedule = [
-            time for time in self.battery_respawn_schedule if time > now
-        ]
-        for _ in ready:
+        ready = 0
+        while schedule and schedule[0] <= now:
+            heapq.heappop(schedule)
+            ready += 1
+        for _ in range(ready):
             spawned = 0
             while spawned < self.battery_respawn_batch and self._spawn_battery():
                 spawned += 1
@@ -1236,8 +1416,11 @@ class PlayingState:
         ghost = Ghost(x, y, self.settings["ghost_speed"], self.settings.get("fps", 60))
         self.ghosts.append(ghost)
 
-    def _keep_ghost_outside_safe_zone(self, ghost: Ghost, player_outside_border: bool) -> None:
-        bounds = self._current_border_bounds() if player_outside_border else self._safe_bounds()
+    def _keep_ghost_outside_safe_zone(
+        self,
+        ghost: Ghost,
+        bounds: Tuple[float, float, float, float],
+    ) -> None:
         new_x, new_y, moved = self._push_point_outside_bounds(ghost.x, ghost.y, bounds, padding=4.0)
         if not moved:
             return
@@ -1246,11 +1429,10 @@ class PlayingState:
         ghost.rect.center = (int(ghost.x), int(ghost.y))
         ghost.random_target = None
 
-    def _update_ghosts(self, dt: float) -> None:
+    def _update_ghosts(self, dt: float, now: int) -> None:
         if not self.is_night:
             return
 
-        now = pygame.time.get_ticks()
         if len(self.ghosts) < self.ghost_max_count and now >= self.next_ghost_spawn_ms:
             self._spawn_ghost()
             self.next_ghost_spawn_ms = now + self.ghost_spawn_interval_ms
@@ -1261,54 +1443,70 @@ class PlayingState:
         interval_min = max(200, self.ghost_random_interval_ms // 2)
         interval_max = max(interval_min + 1, int(self.ghost_random_interval_ms * 1.5))
 
-        for ghost in self.ghosts:
-            target = (self.player.x, self.player.y) if player_outside_border else None
-            ghost.update(
-                dt,
-                now,
-                target,
-                self.ghost_random_speed,
-                (interval_min, interval_max),
-                self.ghost_random_radius,
-            )
-            self._keep_ghost_outside_safe_zone(ghost, player_outside_border)
-            if ghost.rect.colliderect(self.player.rect):
+        target = (self.player.x, self.player.y) if player_outside_border else None
+        interval = (interval_min, interval_max)
+        random_speed = self.ghost_random_speed
+        random_radius = self.ghost_random_radius
+        keep_bounds = border_bounds if player_outside_border else self._safe_bounds()
+        player_rect = self.player.rect
+        world_w = self.tilemap.world_width
+        world_h = self.tilemap.world_height
+        ghosts = self.ghosts
+        escaped = False
+        for ghost in ghosts:
+            ghost.update(dt, now, target, random_speed, interval, random_radius)
+            self._keep_ghost_outside_safe_zone(ghost, keep_bounds)
+            if ghost.rect.colliderect(player_rect):
                 self.msglog.add("Ghost caught you outside the zone!", (255, 80, 80))
                 self.audio.sfx("fail")
                 self.game.change_state("menu")
                 return
-
-        self.ghosts = [
-            ghost
-            for ghost in self.ghosts
-            if 0 <= ghost.x <= self.tilemap.world_width
-            and 0 <= ghost.y <= self.tilemap.world_height
-        ]
-
-    def _update_npcs(self, dt: float) -> None:
-        now = pygame.time.get_ticks()
+            if not (0 <= ghost.x <= world_w and 0 <= ghost.y <= world_h):
+                escaped = True
+
+        if escaped:
+            kept = 0
+            for ghost in ghosts:
+                if 0 <= ghost.x <= world_w and 0 <= ghost.y <= world_h:
+                    ghosts[kept] = ghost
+                    kept += 1
+            del ghosts[kept:]
+
+    def _update_npcs(self, dt: float, now: int) -> None:
         interval_ms = int(self.settings["npc_wander_interval_sec"] * 1000)
         radius_px = self.settings["npc_wander_radius_tiles"] * self.tile_size
         bounds = (self.world_min_x, self.world_max_x, self.world_min_y, self.world_max_y)
+        min_x, max_x, min_y, max_y = bounds
+        distance_max = max(40, radius_px)
+        uniform = random.uniform
+        cos = math.cos
+        sin = math.sin
+        tau = math.tau
+        half = self.tile_size // 2
+        candidate_rect = pygame.Rect(0, 0, self.tile_size, self.tile_size)
+        colliders = self.wall_colliders
+        walls_near = self._walls_near
+        keep_outside = self._keep_entity_outside_safe_zone
+        clamp = self._clamp_entity_to_world
         for npc in self.npcs:
             if npc.target is None or now >= npc.next_wander_ms:
                 attempts = 0
                 while attempts < 6:
                     attempts += 1
-                    angle = random.uniform(0, math.tau)
-                    distance = random.uniform(30, max(40, radius_px))
-                    target_x = npc.x + math.cos(angle) * distance
-                    target_y = npc.y + math.sin(angle) * distance
-                    target_x = max(self.world_min_x, min(self.world_max_x, target_x))
-                    target_y = max(self.world_min_y, min(self.world_max_y, target_y))
-                    candidate_rect = self._position_rect((target_x, target_y))
-                    if any(candidate_rect.colliderect(w) for w in self.wall_colliders):
+                    angle = uniform(0, tau)
+                    distance = uniform(30, distance_max)
+                    target_x = npc.x + cos(angle) * distance
+                    target_y = npc.y + sin(angle) * distance
+                    target_x = max(min_x, min(max_x, target_x))
+                    target_y = max(min_y, min(max_y, target_y))
+                    candidate_rect.topleft = (int(target_x - half), int(target_y - half))
+                    if candidate_rect.collidelist(walls_near(candidate_rect)) != -1:
                         continue
                     npc.set_wander_target((target_x, target_y), now + interval_ms)
                     break
-            npc.update(dt, now, self.wall_colliders, bounds)
-            self._keep_entity_outside_safe_zone(npc)
-            self._clamp_entity_to_world(npc)
+            npc.update(dt, now, colliders, bounds)
+            keep_outside(npc)
+            clamp(npc)
 
     def _update_day_hunter(self, dt: float) -> None:
         if not self.day_hunter:
@@ -1333,15 +1531,15 @@ class PlayingState:
         if self.day_hunter_engaged:
             target = player_pos
         else:
-            if (
-                self.day_hunter_patrol_target is None
-                or math.hypot(
-                    self.day_hunter.x - self.day_hunter_patrol_target[0],
-                    self.day_hunter.y - self.day_hunter_patrol_target[1],
-                ) <= self.tile_size
-            ):
-                self.day_hunter_patrol_target = self._select_hunter_patrol_target()
             target = self.day_hunter_patrol_target
+            if target is None:
+                target = self._select_hunter_patrol_target()
+            else:
+                dx = self.day_hunter.x - target[0]
+                dy = self.day_hunter.y - target[1]
+                if dx * dx + dy * dy <= self._tile_size_sq:
+                    target = self._select_hunter_patrol_target()
+            self.day_hunter_patrol_target = target
 
         bounds = (self.world_min_x, self.world_max_x, self.world_min_y, self.world_max_y)
         self.day_hunter.update(
@@ -1359,28 +1557,50 @@ class PlayingState:
             self.game.change_state("menu")
 
 
-    def _update_machine_level_chat(self) -> None:
-        now = pygame.time.get_ticks()
+    def _update_machine_level_chat(self, now: int) -> None:
         extra_reach = self.tile_size * 0.5
+        zone = self._machine_chat_zone
+        if zone is None:
+            zone = self._build_machine_chat_zone(extra_reach)
+            self._machine_chat_zone = zone
+        if not zone.collidepoint(self.player.rect.center) and not self._machine_level_chat_shown:
+            return
+        in_reach = set()
         for machine in self.machines:
-            if machine is None:
+            if not self._within_interaction(machine, extra_reach):
                 continue
-            if self._within_interaction(machine, extra_reach):
-                text = f"Lv {machine.level}"
-                expires = now + 400
-                if machine.chat and machine.chat.text == text:
-                    machine.chat.until = expires
-                else:
-                    machine.chat = ChatBubble(text, self.machine_level_chat_color, expires)
-            elif machine.chat and machine.chat.text.startswith("Lv "):
+            in_reach.add(id(machine))
+            text = f"Lv {machine.level}"
+            expires = now + 400
+            if machine.chat and machine.chat.text == text:
+                machine.chat.until = expires
+            else:
+                machine.chat = ChatBubble(text, self.machine_level_chat_color, expires)
+                self._track_chat(machine, expires)
+        for machine in self.machines:
+            if id(machine) in in_reach:
+                continue
+            if machine.chat and machine.chat.text.startswith("Lv "):
                 machine.chat = None
+        self._machine_level_chat_shown = bool(in_reach)
+
+    def _build_machine_chat_zone(self, extra_reach: float) -> pygame.Rect:
+        zones = []
+        for machine in self.machines:
+            rect = machine.rect
+            reach = math.ceil(self.interaction_radius_px + extra_reach + max(rect.width, rect.height) * 0.5)
+            zones.append(pygame.Rect(rect.centerx - reach, rect.centery - reach, reach * 2 + 1, reach * 2 + 1))
+        if not zones:
+            return pygame.Rect(0, 0, 0, 0)
+        return zones[0].unionall(zones[1:])
 
     def _check_machine_victory(self) -> None:
         if self.victory_triggered:
             return
 
-        for machine in (m for m in self.machines if m):
-            if machine.level >= self.machine_victory_level:
+        victory_level = self.machine_victory_level
+        for machine in self.machines:
+            if machine.level >= victory_level:
                 self.victory_triggered = True
                 message = f"Machine {machine.display_name} reached level {machine.level}!"
                 self.msglog.add(message, (0, 255, 180))
@@ -1389,26 +1609,37 @@ class PlayingState:
                 self.game.change_state("menu")
                 return
 
-    def _update_chat_bubbles(self) -> None:
-        now = pygame.time.get_ticks()
-        for entity in [self.radio, *self.givers, *self.npcs, *self.machines]:
-            if entity and entity.chat and now >= entity.chat.until:
-                entity.chat = None
+    def _rebuild_chat_entities(self) -> None:
+        self._chat_entities = [
+            entity for entity in (self.radio, *self.givers, *self.npcs, *self.machines) if entity
+        ]
 
-    def _handle_pickups(self) -> None:
-        remaining_items: List[ItemEntity] = []
-        for item in self.items:
-            if not item.alive:
-                continue
-            if not self.player.rect.colliderect(item.rect):
-                remaining_items.append(item)
+    def _update_chat_bubbles(self, now: int) -> None:
+        heap = self._active_chats
+        if not heap:
+            return
+        while heap and heap[0][0] <= now:
+            _, _, entity = heapq.heappop(heap)
+            chat = entity.chat
+            if not chat:
                 continue
+            if now >= chat.until:
+                entity.chat = None
+            else:
+                self._track_chat(entity, chat.until)
 
-            if item.item in CANDY_TYPES:
+    def _handle_pickups(self) -> None:
+        hits = self.player.rect.collidelistall(self._live_item_rects)
+        if not hits:
+            return
+        items = self.items
+        for index in reversed(hits):
+            item = items[index]
+            candy_index = item.candy_index
+            if candy_index >= 0:
                 gained, bonus = self._collect_candy(item.item, item.yield_count)
-                self.candy_active_counts[item.item] = max(
-                    0, self.candy_active_counts[item.item] - 1
-                )
+                counts = self.candy_active_counts
+                counts[candy_index] = max(0, counts[candy_index] - 1)
                 if item.spawn_position:
                     self._release_candy_position(item.spawn_position)
                 if bonus:
@@ -1417,6 +1648,7 @@ class PlayingState:
                         (200, 255, 160),
                     )
                 self.audio.sfx("pickup")
+                self._remove_item_at(index)
                 continue
 
             leftover = self.player.inventory.add(item.item, item.yield_count)
@@ -1426,10 +1658,7 @@ class PlayingState:
                     if item.spawn_position:
                         self._release_battery_position(item.spawn_position)
                 self.audio.sfx("pickup")
-            else:
-                remaining_items.append(item)
-
-        self.items = remaining_items
+                self._remove_item_at(index)
 
 
     def _enforce_ui_ranges(self) -> None:
@@ -1438,8 +1667,8 @@ class PlayingState:
         if self.trash_ui.visible and not (self.trash_can and self._within_interaction(self.trash_can)):
             self.trash_ui.hide()
 
-    def _update_events(self) -> None:
-        result = self.events.update(self.player.inventory)
+    def _update_events(self, now: int) -> None:
+        result = self.events.update(self.player.inventory, now)
         if not result or result[0] != "event":
             return
 
@@ -1480,85 +1709,95 @@ class PlayingState:
     def _update_camera(self) -> None:
         map_width = self.tilemap.world_width
         map_height = self.tilemap.world_height
-        screen_w, screen_h = self.screen.get_size()
+        screen_w, screen_h = self._screen_size
         self.cam_x = max(0, min(map_width - screen_w, int(self.player.x - screen_w // 2)))
         self.cam_y = max(0, min(map_height - screen_h, int(self.player.y - screen_h // 2)))
 
-    def _update_info_panel(self) -> None:
+    def _update_info_panel(self, now: int) -> None:
         countdown = (
-            self.events.seconds_until_event()
+            self.events.seconds_until_event(now)
             if self.settings.get("radio_event_countdown_display", False)
             else None
         )
         self.info_ui.update(self.day, self.time_minutes, self.world_progress.world_exp, countdown)
 
     def draw(self, surface: pygame.Surface) -> None:
+        now = pygame.time.get_ticks()
+        if self.cutscene_until > now:
+            surface.fill((0, 0, 0))
+            return
         camx, camy = self.cam_x, self.cam_y
-        screen_w, screen_h = surface.get_size()
-
-        tile_start_x = max(0, camx // self.tile_size)
-        tile_start_y = max(0, camy // self.tile_size)
-        tile_end_x = min(self.tilemap.width, (camx + screen_w) // self.tile_size + 2)
-        tile_end_y = min(self.tilemap.height, (camy + screen_h) // self.tile_size + 2)
-
-        for tile_y in range(tile_start_y, tile_end_y):
-            for tile_x in range(tile_start_x, tile_end_x):
-                tile = self.tilemap.tiles[tile_y][tile_x]
-                sprite = self._get_tile_sprite(tile, tile_x, tile_y)
-                surface.blit(
-                    sprite,
-                    (
-                        tile_x * self.tile_size - camx,
-                        tile_y * self.tile_size - camy,
-                    ),
-                )
-
-        for wall in self.walls:
-            surface.blit(wall.image, wall.rect.move(-camx, -camy))
-
+        screen_w, screen_h = self._screen_size
+
+        chunk_px = self._map_chunk_px
+        chunks_x, chunks_y = self._map_chunk_counts
+        chunk_start_x = max(0, camx // chunk_px)
+        chunk_start_y = max(0, camy // chunk_px)
+        chunk_end_x = min(chunks_x, -(-(camx + screen_w) // chunk_px))
+        chunk_end_y = min(chunks_y, -(-(camy + screen_h) // chunk_px))
+
+        blits: List[Tuple[pygame.Surface, object]] = []
+        append = blits.append
+        chunks = self._map_chunks
+        for chunk_y in range(chunk_start_y, chunk_end_y):
+            for chunk_x in range(chunk_start_x, chunk_end_x):
+                chunk = chunks.get((chunk_x, chunk_y))
+                if chunk is None:
+                    chunk = self._build_map_chunk(chunk_x, chunk_y)
+                append((chunk, (chunk_x * chunk_px - camx, chunk_y * chunk_px - camy)))
+
+        view = pygame.Rect(camx, camy, screen_w, screen_h)
+        in_view = view.colliderect
+        walls = self.walls
+        for index in view.collidelistall(self.wall_colliders):
+            wall = walls[index]
+            append((wall.image, (wall.rect.x - camx, wall.rect.y - camy)))
         for giver in self.givers:
-            surface.blit(giver.image, giver.rect.move(-camx, -camy))
+            rect = giver.rect
+            if in_view(rect):
+                append((giver.image, (rect.x - camx, rect.y - camy)))
         for npc in self.npcs:
-            surface.blit(npc.image, npc.rect.move(-camx, -camy))
+            rect = npc.rect
+            if in_view(rect):
+                append((npc.image, (rect.x - camx, rect.y - camy)))
         if self.day_hunter and not self.is_night:
-            surface.blit(self.day_hunter.image, self.day_hunter.rect.move(-camx, -camy))
-        for item in self.items:
-            surface.blit(item.image, item.rect.move(-camx, -camy))
+            hunter = self.day_hunter
+            append((hunter.image, (hunter.rect.x - camx, hunter.rect.y - camy)))
+        items = self.items
+        for index in view.collidelistall(self._live_item_rects):
+            item = items[index]
+            append((item.image, (item.rect.x - camx, item.rect.y - camy)))
 
-        machine_now = pygame.time.get_ticks()
         for machine in self.machines:
-            machine.update_animation(machine_now)
-            surface.blit(machine.image, machine.rect.move(-camx, -camy))
-        surface.blit(self.radio.image, self.radio.rect.move(-camx, -camy))
-        surface.blit(self.table.image, self.table.rect.move(-camx, -camy))
-        if self.trash_can:
-            surface.blit(self.trash_can.image, self.trash_can.rect.move(-camx, -camy))
-        surface.blit(self.player.image, self.player.rect.move(-camx, -camy))
+            machine.update_animation(now)
+            rect = machine.rect
+            if in_view(rect):
+                append((machine.image, (rect.x - camx, rect.y - camy)))
+        for entity in self._static_draw_entities:
+            append((entity.image, (entity.rect.x - camx, entity.rect.y - camy)))
+        append((self.player.image, (self.player.rect.x - camx, self.player.rect.y - camy)))
+        _blit_batch(surface, blits)
 
         if self.is_night or self.light_level > 0:
-            overlay = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
-            alpha = int(220 * self.light_level)
-            overlay.fill((0, 0, 0, alpha))
-            safe_rect = pygame.Rect(
-                int(self.safe_rect_world.left - camx),
-                int(self.safe_rect_world.top - camy),
-                self.safe_rect_world.width,
-                self.safe_rect_world.height,
-            )
-            pygame.draw.rect(overlay, (0, 0, 0, 0), safe_rect)
-            surface.blit(overlay, (0, 0))
+            self._draw_darkness(surface, camx, camy)
 
-        for ghost in self.ghosts:
-            surface.blit(ghost.image, ghost.rect.move(-camx, -camy))
+        visible_ghosts = [
+            (ghost.image, (ghost.rect.x - camx, ghost.rect.y - camy))
+            for ghost in self.ghosts
+            if view.colliderect(ghost.rect)
+        ]
+        if visible_ghosts:
+            _blit_batch(surface, visible_ghosts)
 
         self._draw_chat_bubbles(surface, camx, camy)
         self._draw_border(surface, camx, camy)
 
         self._draw_inventory(surface)
 
-        self.craft_ui.center = (screen_w // 2, screen_h // 2)
+        screen_center = (screen_w // 2, screen_h // 2)
+        self.craft_ui.center = screen_center
         self.craft_ui.draw(surface)
-        self.trash_ui.center = (screen_w // 2, screen_h // 2)
+        self.trash_ui.center = screen_center
         self.trash_ui.draw(surface)
 
         self.msglog.draw(surface, pos=(10, screen_h - 180))
@@ -1566,17 +1805,41 @@ class PlayingState:
         self.info_ui.draw(surface)
         self._draw_candy_panel(surface)
 
-        if self.cutscene_until > pygame.time.get_ticks():
-            blackout = pygame.Surface(surface.get_size())
-            blackout.fill((0, 0, 0))
-            surface.blit(blackout, (0, 0))
+    def _draw_darkness(self, surface: pygame.Surface, camx: int, camy: int) -> None:
+        alpha = int(220 * self.light_level)
+        if alpha <= 0:
+            return
+        size = self._screen_size
+        overlay = self._dark_overlay
+        if overlay is None or overlay.get_size() != size:
+            overlay = pygame.Surface(size, pygame.SRCALPHA)
+            self._dark_overlay = overlay
+            self._dark_overlay_alpha = -1
+        if self._dark_overlay_alpha != alpha:
+            overlay.fill((0, 0, 0, alpha))
+            self._dark_overlay_alpha = alpha
+        screen_rect = overlay.get_rect()
+        hole = screen_rect.clip(self.safe_rect_world.move(-camx, -camy))
+        if not hole.width or not hole.height:
+            surface.blit(overlay, (0, 0))
+            return
+        width, height = size
+        strips = (
+            (0, 0, width, hole.top),
+            (0, hole.bottom, width, height - hole.bottom),
+            (0, hole.top, hole.left, hole.height),
+            (hole.right, hole.top, width - hole.right, hole.height),
+        )
+        for strip in strips:
+            if strip[2] > 0 and strip[3] > 0:
+                surface.blit(overlay, strip[:2], strip)
 
     def _draw_inventory(self, surface: pygame.Surface) -> None:
         cols = self.player.inventory.cols
         slot = self.inv_ui.slot_size
         pad = self.inv_ui.pad
         total_width = cols * (slot + pad) - pad
-        screen_w, screen_h = surface.get_size()
+        screen_w, screen_h = self._screen_size
         x0 = screen_w // 2 - total_width // 2
         y0 = screen_h - slot - 12
         self.inv_ui.pos = (x0, y0)
@@ -1586,53 +1849,77 @@ class PlayingState:
         if not self.minimap_visible:
             return
         mmw, mmh = self.minimap_size
-        minimap = pygame.Surface((mmw, mmh))
-        minimap.fill((25, 30, 35))
+        if self._minimap_bg is None:
+            self._minimap_bg = self._build_minimap_background()
+        origin_x = self._screen_size[0] - mmw - 12
+        origin_y = 12
+        surface.blit(self._minimap_bg, (origin_x, origin_y))
         scale_x = mmw / self.tilemap.world_width
         scale_y = mmh / self.tilemap.world_height
-        cx, cy = self.safe_center_world
-        safe_rect = pygame.Rect(
-            int(self.safe_rect_world.left * scale_x),
-            int(self.safe_rect_world.top * scale_y),
-            max(1, int(self.safe_rect_world.width * scale_x)),
-            max(1, int(self.safe_rect_world.height * scale_y)),
-        )
-        pygame.draw.rect(minimap, (40, 120, 180), safe_rect, 2)
+        previous_clip = surface.get_clip()
+        surface.set_clip(previous_clip.clip((origin_x, origin_y, mmw, mmh)))
         if self.is_night:
-            left, top, right, bottom = self._current_border_bounds()
-            border_rect = pygame.Rect(
-                int(left * scale_x),
-                int(top * scale_y),
-                max(1, int((right - left) * scale_x)),
-                max(1, int((bottom - top) * scale_y)),
-            )
-            pygame.draw.rect(minimap, (200, 50, 50), border_rect, 1)
+            bounds = self._current_border_bounds()
+            if bounds != self._minimap_border_bounds:
+                left, top, right, bottom = bounds
+                self._minimap_border_rect = pygame.Rect(
+                    int(left * scale_x),
+                    int(top * scale_y),
+                    max(1, int((right - left) * scale_x)),
+                    max(1, int((bottom - top) * scale_y)),
+                )
+                self._minimap_border_bounds = bounds
+            pygame.draw.rect(surface, (200, 50, 50), self._minimap_border_rect.move(origin_x, origin_y), 1)
         pygame.draw.rect(
-            minimap,
+            surface,
             (255, 255, 0),
             (
-                int(self.player.x * scale_x) - 2,
-                int(self.player.y * scale_y) - 2,
+                origin_x + int(self.player.x * scale_x) - 2,
+                origin_y + int(self.player.y * scale_y) - 2,
                 4,
                 4,
             ),
         )
-        surface.blit(minimap, (surface.get_width() - mmw - 12, 12))
+        surface.set_clip(previous_clip)
+
+    def _build_minimap_background(self) -> pygame.Surface:
+        mmw, mmh = self.minimap_size
+        minimap = pygame.Surface((mmw, mmh)).convert()
+        minimap.fill((25, 30, 35))
+        scale_x = mmw / self.tilemap.world_width
+        scale_y = mmh / self.tilemap.world_height
+        safe_rect = pygame.Rect(
+            int(self.safe_rect_world.left * scale_x),
+            int(self.safe_rect_world.top * scale_y),
+            max(1, int(self.safe_rect_world.width * scale_x)),
+            max(1, int(self.safe_rect_world.height * scale_y)),
+        )
+        pygame.draw.rect(minimap, (40, 120, 180), safe_rect, 2)
+        return minimap
 
     def _draw_candy_panel(self, surface: pygame.Surface) -> None:
-        entries = len(CANDY_TYPES)
-        width = 180
-        height = 20 + entries * 18
-        panel = pygame.Surface((width, height), pygame.SRCALPHA)
-        panel.fill((20, 20, 30, 200))
-        surface.blit(panel, (surface.get_width() - width - 12, surface.get_height() - height - 12))
-        y = surface.get_height() - height - 12 + 8
-        x = surface.get_width() - width - 12 + 10
+        panel = self._candy_panel_bg
+        if panel is None:
+            entries = len(CANDY_TYPES)
+            panel = pygame.Surface((180, 20 + entries * 18), pygame.SRCALPHA)
+            panel.fill((20, 20, 30, 200))
+            self._candy_panel_bg = panel
+        width, height = panel.get_size()
+        screen_w, screen_h = self._screen_size
+        panel_x = screen_w - width - 12
+        panel_y = screen_h - height - 12
+        surface.blit(panel, (panel_x, panel_y))
+        y = panel_y + 8
+        x = panel_x + 10
+        lines = self._candy_panel_lines
         for candy in CANDY_TYPES:
             count = self.candy_stockpile.amount(candy)
-            label = CANDY_LABELS[candy]
-            text = self.font.render(f"{label}: {count}", True, (255, 255, 255))
-            surface.blit(text, (x, y))
+            cached = lines.get(candy)
+            if cached is None or cached[0] != count:
+                text = self.font.render(f"{CANDY_LABELS[candy]}: {count}", True, (255, 255, 255))
+                cached = (count, text)
+                lines[candy] = cached
+            surface.blit(cached[1], (x, y))
             y += 18
 
     def _draw_border(self, surface: pygame.Surface, camx: int, camy: int) -> None:
@@ -1642,21 +1929,60 @@ class PlayingState:
         pygame.draw.rect(surface, (255, 120, 80), border_rect, 1)
 
     def _draw_chat_bubbles(self, surface: pygame.Surface, camx: int, camy: int) -> None:
-        chat_entities = [self.radio, *self.givers, *self.npcs, *self.machines]
-        for entity in chat_entities:
-            if entity and entity.chat:
-                text = self.font.render(entity.chat.text, True, entity.chat.color)
-                padding = 6
-                bubble = pygame.Surface(
-                    (text.get_width() + padding * 2, text.get_height() + padding * 2),
-                    pygame.SRCALPHA,
-                )
-                bubble.fill((20, 20, 20, 220))
-                bubble.blit(text, (padding, padding))
-                rect = bubble.get_rect(
-                    midbottom=(entity.rect.centerx - camx, entity.rect.top - camy - 4)
-                )
-                surface.blit(bubble, rect)
+        cache = self._bubble_cache
+        blit = surface.blit
+        for entity in self._chat_entities:
+            chat = entity.chat
+            if chat:
+                key = (chat.text, chat.color)
+                bubble = cache.pop(key, None)
+                if bubble is None:
+                    bubble = self._render_chat_bubble(*key)
+                    if len(cache) >= CHAT_BUBBLE_CACHE_SIZE:
+                        del cache[next(iter(cache))]
+                cache[key] = bubble
+                rect = entity.rect
+                blit(bubble, bubble.get_rect(midbottom=(rect.centerx - camx, rect.top - camy - 4)))
+
+    def _render_chat_bubble(self, message: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        text = self.font.render(message, True, color)
+        padding = 6
+        bubble = pygame.Surface(
+            (text.get_width() + padding * 2, text.get_height() + padding * 2),
+            pygame.SRCALPHA,
+        )
+        bubble.fill((20, 20, 20, 220))
+        bubble.blit(text, (padding, padding))
+        return bubble.convert_alpha()
+
+    @property
+    def safe_tile_surfaces(self) -> Dict[str, pygame.Surface]:
+        if self._safe_tile_surfaces is None:
+            self._safe_tile_surfaces = self._load_safe_tile_images()
+        return self._safe_tile_surfaces
+
+    def _build_map_chunk(self, chunk_x: int, chunk_y: int) -> pygame.Surface:
+        if self._tile_id_grid is None:
+            self._build_tile_id_grid()
+        tile_ids = self._tile_id_grid
+        sprites = self._sprites_by_id
+        chunk_tiles = self._map_chunk_tiles
+        tile_size = self.tile_size
+        x0 = chunk_x * chunk_tiles
+        y0 = chunk_y * chunk_tiles
+        x1 = min(self.tilemap.width, x0 + chunk_tiles)
+        y1 = min(self.tilemap.height, y0 + chunk_tiles)
+        chunk = pygame.Surface(((x1 - x0) * tile_size, (y1 - y0) * tile_size)).convert()
+        chunk.blits(
+            [
+                (sprites[tile_ids[tile_y][tile_x]], ((tile_x - x0) * tile_size, (tile_y - y0) * tile_size))
+                for tile_y in range(y0, y1)
+                for tile_x in range(x0, x1)
+            ],
+            False,
+        )
+        self._map_chunks[(chunk_x, chunk_y)] = chunk
+        return chunk
 
     def _load_safe_tile_images(self) -> Dict[str, pygame.Surface]:
         tileset_dir = Path("assets/Map/InnerWorld/Tileset/Sàn")
@@ -1672,15 +1998,18 @@ class PlayingState:
             "corner_br": "Sàn cỏ - góc phải dưới.png",
         }
         images: Dict[str, pygame.Surface] = {}
+        fallback: Optional[pygame.Surface] = None
         for key, filename in filenames.items():
             path_obj = tileset_dir / filename
             try:
-                surface = pygame.image.load(str(path_obj)).convert_alpha()
+                loaded = pygame.image.load(str(path_obj)).convert_alpha()
             except pygame.error:
-                fallback = pygame.Surface((self.tile_size, self.tile_size), pygame.SRCALPHA)
-                fallback.fill((80, 160, 80))
+                if fallback is None:
+                    fallback = pygame.Surface((self.tile_size, self.tile_size)).convert()
+                    fallback.fill((80, 160, 80))
                 surface = fallback
             else:
+                surface = loaded.convert() if _is_opaque(loaded) else loaded
                 if surface.get_size() != (self.tile_size, self.tile_size):
                     surface = pygame.transform.scale(surface, (self.tile_size, self.tile_size))
             images[key] = surface
@@ -1728,28 +2057,40 @@ class PlayingState:
             key = "interior"
         return images.get(key, interior)
 
+    def _build_tile_id_grid(self) -> None:
+        sprites: List[pygame.Surface] = []
+        ids_by_sprite: Dict[int, int] = {}
+        grid: List[List[int]] = []
+        for tile_y, row in enumerate(self.tilemap.tiles):
+            id_row: List[int] = []
+            for tile_x, tile_name in enumerate(row):
+                sprite = self._get_tile_sprite(tile_name, tile_x, tile_y)
+                sprite_id = ids_by_sprite.get(id(sprite))
+                if sprite_id is None:
+                    sprite_id = len(sprites)
+                    ids_by_sprite[id(sprite)] = sprite_id
+                    sprites.append(sprite)
+                id_row.append(sprite_id)
+            grid.append(id_row)
+        self._sprites_by_id = sprites
+        self._tile_id_grid = grid
+
     def _get_tile_sprite(self, tile_name: str, tile_x: int, tile_y: int) -> pygame.Surface:
         if tile_name == "safe":
             return self._safe_tile_sprite(tile_x, tile_y)
-        sprites_dir = Path("assets/sprites")
-        if tile_name == "grass":
-            candidate = sprites_dir / "tile_grass.bmp"
-        else:
-            candidate = sprites_dir / f"{tile_name}.bmp"
-            if not candidate.exists():
-                candidate = sprites_dir / "tile_grass.bmp"
-        cache_key = candidate.as_posix()
-        sprite = self._tile_sprite_cache.get(cache_key)
-        if sprite is None:
-            try:
-                sprite = pygame.image.load(str(candidate)).convert()
-            except pygame.error:
-                fallback = pygame.Surface((self.tile_size, self.tile_size))
-                fallback.fill((50, 150, 50))
-                sprite = fallback.convert()
-            if sprite.get_size() != (self.tile_size, self.tile_size):
-                sprite = pygame.transform.scale(sprite, (self.tile_size, self.tile_size))
-            self._tile_sprite_cache[cache_key] = sprite
+        sprite = self._tile_sprites_by_name.get(tile_name)
+        if sprite is not None:
+            return sprite
+        candidate = self._tile_paths.get(tile_name, self._grass_tile_path)
+        try:
+            sprite = pygame.image.load(str(candidate)).convert()
+        except pygame.error:
+            fallback = pygame.Surface((self.tile_size, self.tile_size))
+            fallback.fill((50, 150, 50))
+            sprite = fallback.convert()
+        if sprite.get_size() != (self.tile_size, self.tile_size):
+            sprite = pygame.transform.scale(sprite, (self.tile_size, self.tile_size))
+        self._tile_sprites_by_name[tile_name] = sprite
         return sprite
 
 